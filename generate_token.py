@@ -9,13 +9,12 @@ configured in the server.
 
 import os
 import sys
-import yaml
 import argparse
-from dotenv import load_dotenv
 
 # Add the weather_mcp directory to the path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from weather_mcp.utils.auth import generate_token
+from weather_mcp.utils.config_cache import load_config
 
 def main():
     """Main entry point for the token generation script."""
@@ -47,8 +46,10 @@ def main():
     
     # If not provided as arguments, try environment variables
     if not secret_key or not expiry:
-        # Try to load from .env file
-        load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'weather_mcp', '.env'))
+        # Try to load from .env file, unless the environment already has both values
+        if not (os.getenv("AUTH_SECRET_KEY") and os.getenv("AUTH_TOKEN_EXPIRY")):
+            from dotenv import load_dotenv
+            load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'weather_mcp', '.env'), override=False)
         
         if not secret_key:
             secret_key = os.getenv("AUTH_SECRET_KEY")
@@ -66,8 +67,7 @@ def main():
         config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'weather_mcp', 'config.yaml')
         if os.path.exists(config_path):
             try:
-                with open(config_path, 'r') as f:
-                    config = yaml.safe_load(f)
+                config = load_config(str(config_path))
                 
                 if not secret_key and config.get('auth', {}).get('secret_key'):
                     secret_key = config['auth']['secret_key']
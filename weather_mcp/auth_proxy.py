@@ -8,49 +8,74 @@ to all requests. It forwards authenticated requests to the actual MCP server.
 
 import os
 import sys
+import atexit
+import queue
 import logging
+import logging.handlers
 import argparse
-import yaml
-import requests
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+import httpx
 from dotenv import load_dotenv
-from fastapi import FastAPI, Request, HTTPException, Depends
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi import FastAPI, Request, HTTPException
+from fastapi.responses import Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.background import BackgroundTask
 import uvicorn
 
 # Import auth module directly since we're in the Docker container
-from utils.auth import validate_token, get_token_from_request
+from utils.auth import (
+    AUTH_BYPASS_PATHS,
+    get_bearer_token_from_scope,
+    unauthorized_messages,
+    validate_token_cached,
+)
+from utils.config_cache import load_config
 
 # Initialize logging
 # Check if we're running in a Docker container
 in_docker = os.path.exists('/.dockerenv') or os.environ.get('DOCKER_CONTAINER') == 'true'
 
-# Set log file path based on environment
+# Configure logging. Records are handed to a queue and written by a
+# background listener thread, so request handling never waits on disk I/O.
+log_format = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 if in_docker:
-    log_file = '/var/log/supervisor/auth_proxy.log'
+    # supervisord already writes this process's stdout to
+    # /var/log/supervisor/auth_proxy.log and rotates it, so log to stdout
+    # instead of opening the same file a second time
+    log_handler = logging.StreamHandler(sys.stdout)
 else:
     # Use a local log file when running outside Docker
     log_file = 'auth_proxy.log'
+    try:
+        log_handler = logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=10 * 1024 * 1024,
+            backupCount=5
+        )
+    except (FileNotFoundError, PermissionError):
+        # Fallback to console logging if file logging fails
+        log_handler = logging.StreamHandler()
+        print(f"Warning: Could not write to log file {log_file}, logging to console instead")
+log_handler.setFormatter(log_format)
 
-# Configure logging
-try:
-    logging.basicConfig(
-        filename=log_file,
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-except (FileNotFoundError, PermissionError):
-    # Fallback to console logging if file logging fails
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    print(f"Warning: Could not write to log file {log_file}, logging to console instead")
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(log_queue, log_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+root_logger = logging.getLogger()
+root_logger.setLevel(logging.INFO)
+root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+# httpx logs every upstream request at INFO; keep only its warnings
+logging.getLogger("httpx").setLevel(logging.WARNING)
 
 logger = logging.getLogger('auth_proxy')
 
-# Load environment variables from .env file if it exists
-load_dotenv()
+# Load environment variables from .env file if it exists, unless the
+# environment already provides everything this proxy reads
+if not (os.getenv('AUTH_ENABLED') and os.getenv('AUTH_SECRET_KEY')):
+    load_dotenv(override=False)
 
 # Load configuration
 auth_enabled = os.getenv('AUTH_ENABLED', 'false').lower() == 'true'
@@ -60,17 +85,12 @@ auth_secret_key = os.getenv('AUTH_SECRET_KEY')
 if not auth_secret_key:
     logger.info("Auth secret key not found in environment variables, checking config.yaml")
     
-    # Set config path based on environment
-    if in_docker:
-        config_path = '/app/config.yaml'  # Direct path in Docker container
-    else:
-        # Use a relative path when running outside Docker
-        config_path = os.path.join(os.path.dirname(__file__), 'config.yaml')
+    # config.yaml sits next to this file both locally and in the Docker image (/app)
+    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.yaml')
     
     logger.info(f"Looking for config file at: {config_path}")
     try:
-        with open(config_path) as f:
-            config = yaml.safe_load(f)
+        config = load_config(config_path)
         
         # Load auth config if not set from environment
         if config.get('auth', {}).get('secret_key'):
@@ -83,8 +103,120 @@ if not auth_secret_key:
     except Exception as e:
         logger.warning(f"Error reading config file: {str(e)}")
 
+@dataclass(frozen=True, slots=True)
+class AuthSettings:
+    """Authentication settings resolved once at startup."""
+    enabled: bool
+    secret_key: bytes
+    skip_paths: frozenset
+
+auth_settings = AuthSettings(
+    enabled=bool(auth_enabled),
+    secret_key=(auth_secret_key or '').encode('utf-8'),
+    skip_paths=AUTH_BYPASS_PATHS,
+)
+
+# 401 responses are constant, so build their ASGI messages once
+UNAUTHORIZED_MISSING = unauthorized_messages(b'{"detail":"Unauthorized: Missing Bearer Token"}')
+UNAUTHORIZED_INVALID = unauthorized_messages(b'{"detail":"Unauthorized: Invalid Bearer Token"}')
+
+# Shared HTTP client for forwarding requests to the MCP server.
+# Created on startup so that it is bound to the server's event loop.
+MCP_SERVER_URL = "http://localhost:3399"
+PROXY_CHUNK_SIZE = 65536
+# Proxied SSE streams stay open for as long as their clients are connected,
+# so reads never time out and the pool has no connection limit; a bounded
+# pool would make every later request wait once enough streams are open.
+PROXY_TIMEOUT = httpx.Timeout(connect=10.0, read=None, write=30.0, pool=10.0)
+PROXY_LIMITS = httpx.Limits(max_connections=None, max_keepalive_connections=20)
+client = None
+
+@asynccontextmanager
+async def lifespan(app):
+    """Create the shared upstream HTTP client on startup and close it on shutdown."""
+    global client
+    client = httpx.AsyncClient(base_url=MCP_SERVER_URL, timeout=PROXY_TIMEOUT, limits=PROXY_LIMITS)
+    try:
+        yield
+    finally:
+        await client.aclose()
+
 # Create FastAPI app
-app = FastAPI(title="Weather MCP Auth Proxy")
+app = FastAPI(title="Weather MCP Auth Proxy", lifespan=lifespan)
+
+# Define authentication middleware
+class AuthASGIMiddleware:
+    """
+    Pure ASGI middleware that authenticates requests using Bearer Token.
+
+    Works directly on the ASGI scope instead of building a Request object,
+    and answers unauthenticated requests itself without calling the app.
+    """
+
+    def __init__(self, app, settings):
+        """
+        Initialize the authentication middleware.
+
+        Args:
+            app: The ASGI application to wrap
+            settings: The AuthSettings used to validate tokens
+        """
+        self.app = app
+        self.secret_key = settings.secret_key
+        self.skip_paths = settings.skip_paths
+
+    async def __call__(self, scope, receive, send):
+        # Only HTTP requests carry a Bearer Token; pass everything else through
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+
+        # Skip authentication for health check endpoint
+        if path in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        # Log the request path for debugging
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Authenticating request to {path}")
+
+        # Extract the token straight from the raw header bytes
+        token_bytes = get_bearer_token_from_scope(scope)
+        if token_bytes is None:
+            logger.warning(f"Authentication failed: Missing Bearer Token for {path}")
+            await self._send_unauthorized(send, UNAUTHORIZED_MISSING)
+            return
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Validating token: {token_bytes[:20].decode('latin-1')}...")
+        # Reuse a recent verdict for this token to skip the signature check
+        is_valid, payload = validate_token_cached(token_bytes, self.secret_key)
+        if not is_valid:
+            logger.warning(f"Authentication failed: Invalid Bearer Token for {path}")
+            await self._send_unauthorized(send, UNAUTHORIZED_INVALID)
+            return
+
+        # Token is valid; expose its claims (read-only, shared through the
+        # token cache) to route handlers via request.state
+        scope.setdefault("state", {})["auth_payload"] = payload
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Authentication successful for {path}")
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _send_unauthorized(send, messages):
+        """Send prebuilt 401 start and body messages without invoking the wrapped app."""
+        start_message, body_message = messages
+        await send(start_message)
+        await send(body_message)
+
+# Add authentication middleware before CORS so that CORS stays outermost
+# and preflight requests are answered without a token. When authentication
+# is disabled the middleware is not installed at all.
+if auth_settings.enabled:
+    app.add_middleware(AuthASGIMiddleware, settings=auth_settings)
 
 # Add CORS middleware
 app.add_middleware(
@@ -95,160 +227,150 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Define authentication dependency
-async def authenticate(request: Request):
+# Headers that describe a single connection and must not be forwarded as-is
+_HOP_BY_HOP = frozenset(b"host content-length connection transfer-encoding upgrade".split())
+_RESPONSE_SKIP_HEADERS = frozenset((b"content-length", b"transfer-encoding"))
+
+def forward_headers(scope):
+    """Build the upstream request headers directly from the ASGI scope."""
+    return [
+        (k.decode("latin-1"), v.decode("latin-1"))
+        for k, v in scope["headers"]
+        if k not in _HOP_BY_HOP
+    ]
+
+class RawStreamingResponse(StreamingResponse):
     """
-    Authenticate a request using Bearer Token.
-    
+    StreamingResponse that takes ASGI raw headers as-is.
+
+    Skips building a header dict and re-normalizing it for every proxied
+    response; the headers are sent exactly as given.
+    """
+
+    def __init__(self, content, status_code, raw_headers, background=None):
+        super().__init__(content, status_code=status_code, background=background)
+        self.raw_headers = raw_headers
+
+async def forward_request(method, url, headers, params=None, body=None, media_type=None):
+    """
+    Forward a request to the MCP server and stream the response back.
+
     Args:
-        request: The incoming request
-        
+        method: HTTP method of the incoming request
+        url: Path on the MCP server to forward to
+        headers: Headers to forward
+        params: Optional query parameters
+        body: Optional request body
+        media_type: Content type to use if the upstream response has none
+
     Returns:
-        True if authenticated, raises HTTPException if not
+        A RawStreamingResponse that relays the upstream response body
     """
-    # Skip authentication if disabled
-    if not auth_enabled:
-        logger.info(f"Authentication disabled, allowing request to {request.url.path}")
-        return True
-        
-    # Skip authentication for health check endpoint
-    if request.url.path == "/mcp/info":
-        logger.info(f"Skipping authentication for health check endpoint {request.url.path}")
-        return True
-    
-    # Log the request path for debugging
-    logger.info(f"Authenticating request to {request.url.path}")
-    
-    # Extract and validate token
-    token = get_token_from_request(request)
-    if not token:
-        logger.warning(f"Authentication failed: Missing Bearer Token for {request.url.path}")
-        raise HTTPException(
-            status_code=401,
-            detail="Unauthorized: Missing Bearer Token"
-        )
-    
-    # Fix for tokens that already include the "Bearer " prefix
-    if token.startswith("Bearer "):
-        token = token.replace("Bearer ", "", 1)
-        
-    logger.info(f"Validating token: {token[:20]}...")
-    is_valid, payload = validate_token(token, auth_secret_key)
-    if not is_valid:
-        logger.warning(f"Authentication failed: Invalid Bearer Token for {request.url.path}")
-        raise HTTPException(
-            status_code=401,
-            detail="Unauthorized: Invalid Bearer Token"
-        )
-        
-    # Token is valid
-    logger.info(f"Authentication successful for {request.url.path}")
-    return True
+    upstream_request = client.build_request(
+        method,
+        url,
+        headers=headers,
+        params=params,
+        content=body
+    )
+    response = await client.send(upstream_request, stream=True)
+    raw_headers = []
+    has_content_type = False
+    for k, v in response.headers.raw:
+        k = k.lower()
+        if k not in _RESPONSE_SKIP_HEADERS:
+            raw_headers.append((k, v))
+            if k == b"content-type":
+                has_content_type = True
+    if media_type is not None and not has_content_type:
+        raw_headers.append((b"content-type", media_type.encode("latin-1")))
+    return RawStreamingResponse(
+        content=response.aiter_raw(chunk_size=PROXY_CHUNK_SIZE),
+        status_code=response.status_code,
+        raw_headers=raw_headers,
+        background=BackgroundTask(response.aclose)
+    )
 
 # Define proxy routes
 @app.get("/mcp/info")
 async def proxy_info():
     """Proxy the health check endpoint without authentication."""
     try:
-        response = requests.get("http://localhost:3399/mcp/info")
-        return JSONResponse(
-            content=response.json(),
-            status_code=response.status_code
+        # Relay the upstream body as-is instead of decoding and re-encoding it
+        response = await client.get("/mcp/info")
+        return Response(
+            content=response.content,
+            status_code=response.status_code,
+            media_type=response.headers.get("content-type", "application/json")
         )
     except Exception as e:
         logger.error(f"Error proxying health check: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error proxying health check: {str(e)}")
 
-@app.get("/sse", dependencies=[Depends(authenticate)])
+@app.get("/sse")
 async def proxy_sse(request: Request):
     """Proxy the SSE endpoint with authentication."""
     try:
         # Forward the request to the actual MCP server
-        response = requests.get(
-            "http://localhost:3399/sse",
-            headers=dict(request.headers),
-            stream=True
-        )
-        
-        # Return a streaming response
-        return StreamingResponse(
-            content=response.iter_content(chunk_size=1024),
-            status_code=response.status_code,
-            headers=dict(response.headers)
+        return await forward_request(
+            "GET",
+            "/sse",
+            headers=forward_headers(request.scope),
+            media_type="text/event-stream"
         )
     except Exception as e:
         logger.error(f"Error proxying SSE: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error proxying SSE: {str(e)}")
 
-@app.api_route("/mcp", methods=["GET", "POST"], dependencies=[Depends(authenticate)])
+@app.api_route("/mcp", methods=["GET", "POST"])
 async def proxy_stream(request: Request):
     """Proxy the streamable-http endpoint with authentication."""
-    logger.info(f"Proxying streamable-http request to /mcp with method {request.method}")
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug(f"Proxying streamable-http request to /mcp with method {request.method}")
     try:
         # Log the request headers for debugging
-        logger.info(f"Request headers: {request.headers}")
-        
-        # Forward the request to the actual MCP server using the same method
-        logger.info(f"Forwarding {request.method} request to http://localhost:3399/mcp")
+        if debug:
+            logger.debug(f"Request headers: {request.headers}")
+            logger.debug(f"Forwarding {request.method} request to {MCP_SERVER_URL}/mcp")
         
         # Get request body if any
         body = await request.body()
         
         # Forward the request using the same method as the incoming request
-        response = requests.request(
-            method=request.method,
-            url="http://localhost:3399/mcp",
-            headers=dict(request.headers),
-            data=body,
-            stream=True
+        response = await forward_request(
+            request.method,
+            "/mcp",
+            headers=forward_headers(request.scope),
+            body=body
         )
         
         # Log the response status and headers for debugging
-        logger.info(f"Response status: {response.status_code}")
-        logger.info(f"Response headers: {response.headers}")
+        if debug:
+            logger.debug(f"Response status: {response.status_code}")
+            logger.debug(f"Response headers: {response.headers}")
         
         # Return a streaming response
-        logger.info(f"Returning streaming response")
-        return StreamingResponse(
-            content=response.iter_content(chunk_size=1024),
-            status_code=response.status_code,
-            headers=dict(response.headers)
-        )
+        return response
     except Exception as e:
         logger.error(f"Error proxying stream: {str(e)}")
         logger.exception("Exception details:")
         raise HTTPException(status_code=500, detail=f"Error proxying stream: {str(e)}")
 
-@app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "HEAD", "PATCH"], dependencies=[Depends(authenticate)])
+@app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "HEAD", "PATCH"])
 async def proxy_all(path: str, request: Request):
     """Proxy all other endpoints with authentication."""
     try:
-        # Forward the request to the actual MCP server
-        url = f"http://localhost:3399/{path}"
-        method = request.method
-        headers = dict(request.headers)
-        
-        # Get query parameters
-        params = dict(request.query_params)
-        
         # Get request body if any
         body = await request.body()
         
-        # Forward the request
-        response = requests.request(
-            method=method,
-            url=url,
-            headers=headers,
-            params=params,
-            data=body,
-            stream=True
-        )
-        
-        # Return a streaming response
-        return StreamingResponse(
-            content=response.iter_content(chunk_size=1024),
-            status_code=response.status_code,
-            headers=dict(response.headers)
+        # Forward the request to the actual MCP server
+        return await forward_request(
+            request.method,
+            f"/{path}",
+            headers=forward_headers(request.scope),
+            params=dict(request.query_params),
+            body=body
         )
     except Exception as e:
         logger.error(f"Error proxying request: {str(e)}")
@@ -263,10 +385,17 @@ def main():
     
     # Log configuration
     logger.info(f"Starting auth proxy on {args.host}:{args.port}")
-    logger.info(f"Authentication enabled: {auth_enabled}")
+    logger.info(f"Authentication enabled: {auth_settings.enabled}")
     
-    # Start the server
-    uvicorn.run(app, host=args.host, port=args.port)
+    # uvicorn picks uvloop and httptools on its own when uvicorn[standard] provides them.
+    # Requests are already logged by this module, so uvicorn's access log is disabled.
+    uvicorn.run(
+        app,
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+        access_log=False
+    )
 
 if __name__ == "__main__":
     main()
@@ -1,42 +1,120 @@
 # Standard library imports
 import os
+import json
+import gzip
+import atexit
+import queue
 import logging
-import secrets
-from http import HTTPStatus
+import logging.handlers
 
 # Third-party imports
-import yaml
 from fastmcp import FastMCP
-from fastmcp.resources import TextResource
+from fastmcp.resources import TextResource, BinaryResource
 from dotenv import load_dotenv
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse
 
 # Local imports
-from utils.auth import validate_token, get_token_from_request
+from utils.auth import (
+    AUTH_BYPASS_PATHS,
+    get_bearer_token_from_scope,
+    unauthorized_messages,
+    validate_token_cached,
+)
 
 # Load environment variables from .env file if it exists
 load_dotenv()
 
-# Initialize logging
-log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
-logging.basicConfig(
-    filename='weather.log',
-    level=getattr(logging, log_level),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Read every environment variable this module uses in one pass
+_env = os.environ
+ENV_LOG_LEVEL = _env.get('LOG_LEVEL', 'INFO').upper()
+ENV_API_KEY = _env.get('OPENWEATHERMAP_API_KEY')
+ENV_DEFAULT_CITY = _env.get('DEFAULT_CITY')
+ENV_TRANSPORT_MODE = _env.get('MCP_TRANSPORT_MODE')
+ENV_BEHIND_AUTH_PROXY = _env.get('BEHIND_AUTH_PROXY', 'false').lower() == 'true'
+ENV_AUTH_ENABLED = _env.get('AUTH_ENABLED', 'false').lower() == 'true'
+ENV_AUTH_SECRET_KEY = _env.get('AUTH_SECRET_KEY')
+ENV_AUTH_TOKEN_EXPIRY = _env.get('AUTH_TOKEN_EXPIRY')
+# SSE mode also honours the legacy SSE_HOST/SSE_PORT variables
+ENV_SSE_HOST = _env.get('HTTP_HOST') or _env.get('SSE_HOST') or '127.0.0.1'
+ENV_SSE_PORT = _env.get('HTTP_PORT') or _env.get('SSE_PORT') or '3399'
+ENV_HTTP_HOST = _env.get('HTTP_HOST', '127.0.0.1')
+ENV_HTTP_PORT = _env.get('HTTP_PORT', '3399')
+ENV_HTTP_PATH = _env.get('HTTP_PATH', '/mcp')
+ENV_CONFIG_PATH = _env.get('CONFIG_PATH')
+
+# Directory of this module, used to locate config.yaml
+_MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Initialize logging. Records are handed to a queue and written by a
+# background listener thread, so the event loop never waits on disk I/O.
+# The queue is only attached, together with its listener, by _setup_logging()
+# once the server is built (or right away when run as a script). Records
+# logged before that, such as the configuration warnings below, are held in
+# a bounded buffer and replayed into the queue, so importers that never start
+# the server do not fill an undrained queue.
+# Resolve the level once; unknown names fall back to INFO
+log_level = getattr(logging, ENV_LOG_LEVEL, logging.INFO)
+log_queue = queue.SimpleQueue()
+log_queue_handler = logging.handlers.QueueHandler(log_queue)
+
+class _StartupLogBuffer(logging.Handler):
+    """Keep the first `capacity` records until the log listener is running."""
+
+    def __init__(self, capacity):
+        super().__init__()
+        self.capacity = capacity
+        self.records = []
+
+    def emit(self, record):
+        if len(self.records) < self.capacity:
+            self.records.append(record)
+
+log_startup_buffer = _StartupLogBuffer(capacity=1000)
 logger = logging.getLogger('weather_mcp')
+logger.setLevel(log_level)
+logger.addHandler(log_startup_buffer)
+_logging_configured = False
+
+def _setup_logging():
+    """Start writing queued log records to weather.log, once."""
+    global _logging_configured
+    if _logging_configured:
+        return
+    log_file_handler = logging.FileHandler('weather.log')
+    log_file_handler.setFormatter(
+        logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    )
+    # The listener thread does the file writes, so records are written as
+    # they arrive without blocking the event loop
+    log_listener = logging.handlers.QueueListener(log_queue, log_file_handler)
+    log_listener.start()
+    atexit.register(log_listener.stop)
+
+    # Route every logger (including FastMCP's) through the queue from now on,
+    # after replaying the records logged before the listener started
+    logger.removeHandler(log_startup_buffer)
+    for record in log_startup_buffer.records:
+        log_queue_handler.handle(record)
+    log_startup_buffer.records.clear()
+    logging.basicConfig(
+        level=log_level,
+        handlers=[log_queue_handler]
+    )
+    _logging_configured = True
+
+# When run as a script, write the startup configuration logs below too
+if __name__ == "__main__":
+    _setup_logging()
 
 # Load configuration - first try environment variables, then config.yaml
-apikey = os.getenv('OPENWEATHERMAP_API_KEY')
-default_city = os.getenv('DEFAULT_CITY')
-mode = os.getenv('MCP_TRANSPORT_MODE')
+apikey = ENV_API_KEY
+default_city = ENV_DEFAULT_CITY
+mode = ENV_TRANSPORT_MODE
 
 # Authentication configuration
-behind_auth_proxy = os.getenv('BEHIND_AUTH_PROXY', 'false').lower() == 'true'
-auth_enabled = os.getenv('AUTH_ENABLED', 'false').lower() == 'true' and not behind_auth_proxy
-auth_secret_key = os.getenv('AUTH_SECRET_KEY')
-auth_token_expiry = os.getenv('AUTH_TOKEN_EXPIRY')
+behind_auth_proxy = ENV_BEHIND_AUTH_PROXY
+auth_enabled = ENV_AUTH_ENABLED and not behind_auth_proxy
+auth_secret_key = ENV_AUTH_SECRET_KEY
+auth_token_expiry = ENV_AUTH_TOKEN_EXPIRY
 if auth_token_expiry:
     try:
         auth_token_expiry = int(auth_token_expiry)
@@ -49,13 +127,15 @@ else:
 if behind_auth_proxy:
     logger.info("Running behind authentication proxy, disabling built-in authentication")
 
-# If environment variables are not set, try config.yaml
-if not all([apikey, default_city, mode]) or not auth_secret_key:
+# If environment variables are not set, try config.yaml. Behind the auth
+# proxy the secret key is never used, so it does not force a config read.
+if not (apikey and default_city and mode) or (not auth_secret_key and not behind_auth_proxy):
     logger.info("Some configuration not found in environment variables, checking config.yaml")
-    config_path = os.path.join(os.path.dirname(__file__), 'config.yaml')
+    config_path = ENV_CONFIG_PATH or os.path.join(_MODULE_DIR, 'config.yaml')
     try:
-        with open(config_path) as f:
-            config = yaml.safe_load(f)
+        # Imported here so that fully env-configured servers never load the config machinery
+        from utils.config_cache import load_config
+        config = load_config(config_path)
         
         # Only override if not already set from environment
         if not apikey:
@@ -69,7 +149,8 @@ if not all([apikey, default_city, mode]) or not auth_secret_key:
         if not auth_secret_key and config.get('auth', {}).get('secret_key'):
             auth_secret_key = config['auth']['secret_key']
             
-        if not auth_enabled and config.get('auth', {}).get('enabled') is not None:
+        # The auth proxy handles authentication, so config.yaml cannot re-enable it
+        if not auth_enabled and not behind_auth_proxy and config.get('auth', {}).get('enabled') is not None:
             auth_enabled = config['auth']['enabled']
             
         if not auth_token_expiry and config.get('auth', {}).get('token_expiry'):
@@ -78,22 +159,29 @@ if not all([apikey, default_city, mode]) or not auth_secret_key:
         logger.warning(f"Configuration file not found: {config_path}")
     except Exception as e:
         logger.warning(f"Error reading config file: {str(e)}")
+else:
+    logger.info("All configuration provided by environment variables, skipping config.yaml")
 
 # Set defaults for any missing configuration
-if not apikey or apikey == 'YOUR_OPENWEATHERMAP_API_KEY' or apikey == 'your_api_key_here':
+PLACEHOLDER_API_KEYS = frozenset({'YOUR_OPENWEATHERMAP_API_KEY', 'your_api_key_here'})
+CONFIG_DEFAULTS = {
+    'default_city': 'Beijing,cn',
+    'mode': 'stdio',
+}
+if not apikey or apikey in PLACEHOLDER_API_KEYS:
     logger.warning("API key not set or using default value. Please set a valid OpenWeatherMap API key.")
-    
+
+applied_defaults = {}
 if not default_city:
-    default_city = 'Beijing,cn'
-    logger.info(f"Using default city: {default_city}")
-    
+    default_city = applied_defaults['default_city'] = CONFIG_DEFAULTS['default_city']
 if not mode:
-    mode = 'stdio'
-    logger.info(f"Using default transport mode: {mode}")
-    
+    mode = applied_defaults['mode'] = CONFIG_DEFAULTS['mode']
+if applied_defaults:
+    logger.info("Using defaults: %s", applied_defaults)
+
 # Generate a random secret key if not provided and auth is enabled
 if auth_enabled and not auth_secret_key:
-    auth_secret_key = secrets.token_hex(32)
+    auth_secret_key = os.urandom(32).hex()
     logger.warning("No authentication secret key provided. Generated a random key for this session.")
     logger.warning("For production use, please set AUTH_SECRET_KEY in environment or config.yaml.")
 
@@ -107,15 +195,86 @@ elif auth_enabled:
 else:
     logger.info("Authentication is disabled")
     
-# Make config available to other modules
-from plugins.weather import set_config
-set_config(apikey, default_city)
+# Create main MCP server. It is exposed as the module attribute `mcp` through
+# __getattr__ below, which mounts the weather plugin on first access.
+_server = FastMCP(name="WeatherServer")
+
+# Static tool responses, built once at import
+HEALTH_RESPONSE = {
+    "status": "healthy",
+    "service": "weather-mcp-server"
+}
+
+HTML_404 = """
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>404 - Page Not Found</title>
+    <style>
+        body {
+            font-family: Arial, sans-serif;
+            background-color: #f5f5f5;
+            color: #333;
+            margin: 0;
+            padding: 0;
+            display: flex;
+            justify-content: center;
+            align-items: center;
+            height: 100vh;
+        }
+        .container {
+            text-align: center;
+            background-color: white;
+            border-radius: 8px;
+            padding: 40px;
+            box-shadow: 0 4px 8px rgba(0, 0, 0, 0.1);
+            max-width: 500px;
+        }
+        h1 {
+            font-size: 36px;
+            margin-bottom: 10px;
+            color: #e74c3c;
+        }
+        p {
+            font-size: 18px;
+            margin-bottom: 20px;
+        }
+        .back-link {
+            color: #3498db;
+            text-decoration: none;
+            font-weight: bold;
+        }
+        .back-link:hover {
+            text-decoration: underline;
+        }
+        .weather-icon {
+            font-size: 72px;
+            margin-bottom: 20px;
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="weather-icon">🌦️</div>
+        <h1>404 - Page Not Found</h1>
+        <p>Oops! The page you're looking for doesn't exist.</p>
+        <p>This is a Weather MCP Server. It provides weather information through API endpoints.</p>
+        <p>
+            <a href="/" class="back-link">Go to Home</a>
+        </p>
+    </div>
+</body>
+</html>
+"""
 
-# Create main MCP server
-mcp = FastMCP(name="WeatherServer")
+RESPONSE_404 = {
+    "html": HTML_404
+}
 
 # Define a health check tool for Docker
-@mcp.tool()
+@_server.tool()
 async def health_check() -> dict:
     """
     Health check endpoint for Docker.
@@ -124,13 +283,10 @@ async def health_check() -> dict:
     Returns:
         Dictionary with status information
     """
-    return {
-        "status": "healthy",
-        "service": "weather-mcp-server"
-    }
+    return HEALTH_RESPONSE
 
 # Define a custom 404 error page tool
-@mcp.tool()
+@_server.tool()
 async def get_404_page() -> dict:
     """
     Get a custom 404 error page.
@@ -139,75 +295,11 @@ async def get_404_page() -> dict:
     Returns:
         Dictionary with HTML content for the 404 page
     """
-    html_content = """
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>404 - Page Not Found</title>
-        <style>
-            body {
-                font-family: Arial, sans-serif;
-                background-color: #f5f5f5;
-                color: #333;
-                margin: 0;
-                padding: 0;
-                display: flex;
-                justify-content: center;
-                align-items: center;
-                height: 100vh;
-            }
-            .container {
-                text-align: center;
-                background-color: white;
-                border-radius: 8px;
-                padding: 40px;
-                box-shadow: 0 4px 8px rgba(0, 0, 0, 0.1);
-                max-width: 500px;
-            }
-            h1 {
-                font-size: 36px;
-                margin-bottom: 10px;
-                color: #e74c3c;
-            }
-            p {
-                font-size: 18px;
-                margin-bottom: 20px;
-            }
-            .back-link {
-                color: #3498db;
-                text-decoration: none;
-                font-weight: bold;
-            }
-            .back-link:hover {
-                text-decoration: underline;
-            }
-            .weather-icon {
-                font-size: 72px;
-                margin-bottom: 20px;
-            }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="weather-icon">🌦️</div>
-            <h1>404 - Page Not Found</h1>
-            <p>Oops! The page you're looking for doesn't exist.</p>
-            <p>This is a Weather MCP Server. It provides weather information through API endpoints.</p>
-            <p>
-                <a href="/" class="back-link">Go to Home</a>
-            </p>
-        </div>
-    </body>
-    </html>
-    """
-    return {
-        "html": html_content
-    }
+    return RESPONSE_404
 
 # Define health check info as a TextResource for GET /mcp/info
-health_info_text = '{"status": "healthy", "service": "weather-mcp-server"}'
+# Serialized once from HEALTH_RESPONSE so the resource and the tool cannot drift apart
+health_info_text = json.dumps(HEALTH_RESPONSE, separators=(",", ":"))
 health_resource = TextResource(
     uri="resource://mcp/info", # Changed to use resource:// scheme
     name="Health Check Information",
@@ -215,196 +307,251 @@ health_resource = TextResource(
     mime_type="application/json",
     description="Provides a simple health status for the server via GET /mcp/info." # Description might need update later
 )
-mcp.add_resource(health_resource)
+_server.add_resource(health_resource)
+
+# Gzip-compressed copy of the 404 page for clients that can decode it.
+# Compressed once at import; mtime=0 keeps the bytes identical across restarts.
+HTML_404_GZ = gzip.compress(HTML_404.encode('utf-8'), compresslevel=9, mtime=0)
+not_found_resource = BinaryResource(
+    uri="resource://mcp/404.html.gz",
+    name="404 Page (gzip)",
+    data=HTML_404_GZ,
+    mime_type="application/gzip",
+    description="Gzip-compressed copy of the HTML_404 page."
+)
+_server.add_resource(not_found_resource)
+
+# The weather plugin (sub-server) is imported and mounted lazily, so that
+# importing this module does not pull in the plugin and its HTTP client
+_weather_plugin_registered = False
+
+def _register_weather_plugin():
+    """
+    Configure and mount the weather plugin on the main server, once.
+
+    Returns:
+        The main FastMCP server with the weather tools mounted
+    """
+    global _weather_plugin_registered
+    if not _weather_plugin_registered:
+        _setup_logging()
+        from plugins.weather import set_config, weather_mcp
+
+        # Make config available to the plugin
+        set_config(apikey, default_city)
+        _server.mount("weather", weather_mcp)
+        _weather_plugin_registered = True
+    return _server
 
-# No resources for now, just focus on the tools
 
-# Mount the weather plugin (sub-server) for weather tools
-from plugins.weather import weather_mcp
-mcp.mount("weather", weather_mcp)
+def __getattr__(name):
+    """Build the public `mcp` server on first access (e.g. `fastmcp run main.py:mcp`)."""
+    if name == "mcp":
+        return _register_weather_plugin()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Prefixes that identify the SSE endpoint
+SSE_PATH_PREFIXES = ("/sse/", "/sse?")
+
+# 401 responses are constant, so build their ASGI messages once and send
+# the same pair for every rejected request
+UNAUTHORIZED_MISSING_TOKEN = unauthorized_messages(b'{"error":"Unauthorized: Missing Bearer Token"}')
+UNAUTHORIZED_INVALID_TOKEN = unauthorized_messages(b'{"error":"Unauthorized: Invalid Bearer Token"}')
 
-# Define authentication middleware
 # Define authentication function
-def authenticate_request(request):
+def _authenticate_request(scope):
     """
     Authenticate a request using Bearer Token.
     
     Args:
-        request: The request object
+        scope: The ASGI scope of the request
         
     Returns:
         Tuple of (is_authenticated, response)
         - is_authenticated: True if the request is authenticated, False otherwise
-        - response: JSONResponse with error message if not authenticated, None otherwise
+        - response: 401 ASGI (start, body) messages if not authenticated, None otherwise
     """
-    # Skip authentication if disabled
-    if not auth_enabled:
-        logger.info(f"Authentication disabled, allowing request to {request.url.path}")
-        return True, None
-        
+    path = scope["path"]
+    debug = logger.isEnabledFor(logging.DEBUG)
+    
     # Skip authentication for health check endpoint
-    if request.url.path == "/mcp/info":
-        logger.info(f"Skipping authentication for health check endpoint {request.url.path}")
+    if path in AUTH_BYPASS_PATHS:
+        if debug:
+            logger.debug("Skipping authentication for health check endpoint %s", path)
         return True, None
     
-    # Explicitly check for SSE endpoint
-    if request.url.path == "/sse" or request.url.path.startswith("/sse/") or request.url.path.startswith("/sse?"):
-        logger.info(f"SSE endpoint detected: {request.url.path}")
-        
-    # Log the request path for debugging
-    logger.info(f"Authenticating request to {request.url.path}")
+    if debug:
+        # Explicitly check for SSE endpoint
+        if path == "/sse" or path.startswith(SSE_PATH_PREFIXES):
+            logger.debug("SSE endpoint detected: %s", path)
+        # Log the request path for debugging
+        logger.debug("Authenticating request to %s", path)
     
     # Extract and validate token
-    token = get_token_from_request(request)
+    token = get_bearer_token_from_scope(scope)
     if not token:
-        logger.warning(f"Authentication failed: Missing Bearer Token for {request.url.path}")
-        return False, JSONResponse(
-            status_code=401,
-            content={"error": "Unauthorized: Missing Bearer Token"}
-        )
+        logger.warning("Authentication failed: Missing Bearer Token for %s", path)
+        return False, UNAUTHORIZED_MISSING_TOKEN
         
-    logger.info(f"Validating token: {token[:20]}...")
-    is_valid, payload = validate_token(token, auth_secret_key)
+    if debug:
+        logger.debug("Validating token: %s...", token[:20].decode("latin-1"))
+    is_valid, payload = validate_token_cached(token, auth_secret_key)
     if not is_valid:
-        logger.warning(f"Authentication failed: Invalid Bearer Token for {request.url.path}")
-        return False, JSONResponse(
-            status_code=401,
-            content={"error": "Unauthorized: Invalid Bearer Token"}
-        )
+        logger.warning("Authentication failed: Invalid Bearer Token for %s", path)
+        return False, UNAUTHORIZED_INVALID_TOKEN
         
     # Token is valid
-    logger.info(f"Authentication successful for {request.url.path}")
+    if debug:
+        logger.debug("Authentication successful for %s", path)
+    return True, None
+
+
+def _allow_request(scope):
+    """Accept every request; used when authentication is disabled."""
     return True, None
 
 
+# Pick the authentication function once, since auth_enabled is fixed at startup
+authenticate_request = _authenticate_request if auth_enabled else _allow_request
+
+
+class AuthMiddleware:
+    """
+    Pure ASGI middleware that authenticates HTTP requests for the SSE transport.
+
+    Works on the ASGI scope directly, so no Request object is built and no
+    BaseHTTPMiddleware task group is started per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            # Reuse the module-level authentication check
+            is_authenticated, response = authenticate_request(scope)
+            if not is_authenticated:
+                start_message, body_message = response
+                await send(start_message)
+                await send(body_message)
+                return
+        await self.app(scope, receive, send)
+
+
+def run_sse(server):
+    """Run the server with the SSE transport."""
+    # Get host and port from environment or use defaults
+    host = ENV_SSE_HOST
+    port = int(ENV_SSE_PORT)
+
+    logger.info(f"Starting server with SSE transport at http://{host}:{port}")
+
+    # Add authentication directly to the FastMCP server
+    if auth_enabled:
+        logger.info("Setting up authentication for SSE transport")
+
+        # Since we can't directly modify the FastMCP transport classes,
+        # we'll need to use a different approach
+
+        # Let's create a custom ASGI middleware that adds authentication
+        # to all requests, including the SSE endpoint
+
+        from starlette.middleware import Middleware
+
+        # Resolve the underlying Starlette app once, up front
+        app = getattr(server, "_app", None)
+        try:
+            if app is None:
+                raise RuntimeError("FastMCP server does not expose a Starlette app")
+
+            # A sentinel on the app state marks an app we already wrapped
+            if getattr(app.state, "auth_middleware_added", False):
+                logger.info("Authentication middleware already present on FastMCP app")
+            else:
+                # Create a new Starlette app with the middleware
+                from starlette.applications import Starlette
+                new_app = Starlette(
+                    routes=app.routes,
+                    middleware=[Middleware(AuthMiddleware)]
+                )
+                new_app.state.auth_middleware_added = True
+
+                # Replace the FastMCP app with our new app
+                server._app = new_app
+
+                logger.info("Added authentication middleware to FastMCP app")
+        except Exception as e:
+            logger.error(f"Failed to add authentication middleware: {str(e)}")
+            logger.warning("Authentication is enabled but not properly implemented")
+            logger.warning("The SSE endpoint will be accessible without authentication")
+            logger.warning("This is a security vulnerability that needs to be fixed")
+
+    server.run(transport="sse", host=host, port=port)
+
+
+def run_streamable_http(server):
+    """Run the server with the streamable-http transport."""
+    # Get host and port from environment or use defaults
+    host = ENV_HTTP_HOST
+    port = int(ENV_HTTP_PORT)
+    path = ENV_HTTP_PATH
+
+    logger.info(f"Starting server with streamable-http transport at http://{host}:{port}{path}")
+    logger.info(f"Stream endpoint will be available at http://{host}:{port}/mcp")
+
+    # Add authentication for streamable-http transport
+    if auth_enabled:
+        logger.info("Setting up authentication for streamable-http transport")
+
+        try:
+            # Import the transport classes
+            from fastmcp.transports.streamable_http import StreamableHttpTransport
+            from utils.auth_transport import AuthenticatedStreamableHttpTransport
+
+            # Create a custom transport with authentication
+            transport = StreamableHttpTransport(host=host, port=port, path=path)
+            auth_transport = AuthenticatedStreamableHttpTransport(transport, auth_secret_key)
+
+            # Run with the authenticated transport
+            logger.info("Running with authenticated streamable-http transport")
+            server.run(transport=auth_transport)
+        except Exception as e:
+            logger.error(f"Failed to set up authenticated streamable-http transport: {str(e)}")
+            logger.warning("Falling back to standard streamable-http transport without authentication")
+            logger.warning("This is a security vulnerability that needs to be fixed")
+            server.run(transport="streamable-http", host=host, port=port, path=path)
+    else:
+        # Run with standard transport
+        logger.info("Authentication is disabled, using standard streamable-http transport")
+        server.run(transport="streamable-http", host=host, port=port, path=path)
+
+
+def run_stdio(server):
+    """Run the server with the stdio transport."""
+    logger.info("Starting server with stdio transport")
+    server.run(transport="stdio")
+
+
+# Transport runners by mode; unknown modes fall back to stdio
+TRANSPORT_RUNNERS = {
+    'sse': run_sse,
+    'streamable-http': run_streamable_http,
+    'stdio': run_stdio,
+}
+
+
 if __name__ == "__main__":
-    # Log the raw value of the environment variable
-    raw_mode = os.getenv('MCP_TRANSPORT_MODE')
-    logger.info(f"MCP_TRANSPORT_MODE environment variable: {raw_mode}")
+    # Mount the weather plugin right before the server starts
+    mcp = _register_weather_plugin()
     
-    # Log the value of the mode variable before lowercasing
-    logger.info(f"Mode variable before lowercasing: {mode}")
+    # Log the raw environment value next to the resolved mode
+    logger.info(f"MCP_TRANSPORT_MODE environment variable: {ENV_TRANSPORT_MODE}, resolved mode: {mode}")
     
-    mode = mode.lower() if mode else 'stdio'
+    mode = mode.lower()
     logger.info(f"Starting server in {mode.upper()} mode")
     
     try:
-        if mode == 'sse':
-            # Get host and port from environment or use defaults
-            host = os.getenv('HTTP_HOST', os.getenv('SSE_HOST', '127.0.0.1'))
-            port = int(os.getenv('HTTP_PORT', os.getenv('SSE_PORT', '3399')))
-            
-            logger.info(f"Starting server with SSE transport at http://{host}:{port}")
-            
-            # Add authentication directly to the FastMCP server
-            if auth_enabled:
-                logger.info("Setting up authentication for SSE transport")
-                
-                # Since we can't directly modify the FastMCP transport classes,
-                # we'll need to use a different approach
-                
-                # Let's create a custom ASGI middleware that adds authentication
-                # to all requests, including the SSE endpoint
-                
-                from starlette.middleware import Middleware
-                from starlette.middleware.base import BaseHTTPMiddleware
-                
-                class AuthMiddleware(BaseHTTPMiddleware):
-                    async def dispatch(self, request, call_next):
-                        # Skip authentication for health check endpoint
-                        if request.url.path == "/mcp/info":
-                            logger.info(f"Skipping authentication for health check endpoint {request.url.path}")
-                            return await call_next(request)
-                            
-                        # Log the request path for debugging
-                        logger.info(f"Authenticating request to {request.url.path}")
-                        
-                        # Extract and validate token
-                        token = get_token_from_request(request)
-                        if not token:
-                            logger.warning(f"Authentication failed: Missing Bearer Token for {request.url.path}")
-                            return JSONResponse(
-                                status_code=401,
-                                content={"error": "Unauthorized: Missing Bearer Token"}
-                            )
-                            
-                        logger.info(f"Validating token: {token[:20]}...")
-                        is_valid, payload = validate_token(token, auth_secret_key)
-                        if not is_valid:
-                            logger.warning(f"Authentication failed: Invalid Bearer Token for {request.url.path}")
-                            return JSONResponse(
-                                status_code=401,
-                                content={"error": "Unauthorized: Invalid Bearer Token"}
-                            )
-                            
-                        # Token is valid, proceed with the request
-                        logger.info(f"Authentication successful for {request.url.path}")
-                        return await call_next(request)
-                
-                # Try to add the middleware to the FastMCP app
-                try:
-                    # Get the underlying Starlette app
-                    app = mcp._app
-                    
-                    # Add the middleware
-                    from starlette.applications import Starlette
-                    from starlette.routing import Route
-                    
-                    # Create a new Starlette app with the middleware
-                    new_app = Starlette(
-                        routes=app.routes,
-                        middleware=[Middleware(AuthMiddleware)]
-                    )
-                    
-                    # Replace the FastMCP app with our new app
-                    mcp._app = new_app
-                    
-                    logger.info("Added authentication middleware to FastMCP app")
-                except Exception as e:
-                    logger.error(f"Failed to add authentication middleware: {str(e)}")
-                    logger.warning("Authentication is enabled but not properly implemented")
-                    logger.warning("The SSE endpoint will be accessible without authentication")
-                    logger.warning("This is a security vulnerability that needs to be fixed")
-                
-            mcp.run(transport="sse", host=host, port=port)
-        elif mode == 'streamable-http':
-            # Get host and port from environment or use defaults
-            host = os.getenv('HTTP_HOST', '127.0.0.1')
-            port = int(os.getenv('HTTP_PORT', '3399'))
-            path = os.getenv('HTTP_PATH', '/mcp')
-            
-            logger.info(f"Starting server with streamable-http transport at http://{host}:{port}{path}")
-            logger.info(f"Stream endpoint will be available at http://{host}:{port}/mcp")
-            
-            # Add authentication for streamable-http transport
-            if auth_enabled:
-                logger.info("Setting up authentication for streamable-http transport")
-                
-                try:
-                    # Import the transport classes
-                    from fastmcp.transports.streamable_http import StreamableHttpTransport
-                    from utils.auth_transport import AuthenticatedStreamableHttpTransport
-                    
-                    # Create a custom transport with authentication
-                    transport = StreamableHttpTransport(host=host, port=port, path=path)
-                    auth_transport = AuthenticatedStreamableHttpTransport(transport, auth_secret_key)
-                    
-                    # Run with the authenticated transport
-                    logger.info("Running with authenticated streamable-http transport")
-                    mcp.run(transport=auth_transport)
-                except Exception as e:
-                    logger.error(f"Failed to set up authenticated streamable-http transport: {str(e)}")
-                    logger.warning("Falling back to standard streamable-http transport without authentication")
-                    logger.warning("This is a security vulnerability that needs to be fixed")
-                    mcp.run(transport="streamable-http", host=host, port=port, path=path)
-            else:
-                # Run with standard transport
-                logger.info("Authentication is disabled, using standard streamable-http transport")
-                mcp.run(transport="streamable-http", host=host, port=port, path=path)
-        else:
-            # Default to stdio mode
-            logger.info("Starting server with stdio transport")
-            mcp.run(transport="stdio")
+        TRANSPORT_RUNNERS.get(mode, run_stdio)(mcp)
     except Exception as e:
         logger.error(f"Error during server startup: {str(e)}")
         print(f"Error during server startup: {str(e)}")
@@ -1,10 +1,6 @@
-import os
 import sys
 import argparse
-import aiohttp
-from fastmcp import Client
 from pathlib import Path
-from urllib.parse import urlparse
 
 # Add parent directory to path to import auth module
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
@@ -21,6 +17,11 @@ async def main():
     parser.add_argument("--secret", help="Secret key to generate a token")
     args = parser.parse_args()
     
+    # Import the client libraries only once arguments are parsed, so --help
+    # and argument errors return without loading them
+    import aiohttp
+    from fastmcp import Client
+    
     # Handle authentication
     headers = {}
     if args.token:
@@ -1,5 +1,6 @@
 from fastmcp import FastMCP
 import requests
+from requests.adapters import HTTPAdapter
 import logging
 import asyncio
 from datetime import datetime, timedelta
@@ -7,6 +8,10 @@ from datetime import datetime, timedelta
 weather_mcp = FastMCP(name="Weather")
 logger = logging.getLogger('weather_mcp.weather')
 
+# Shared HTTP session so that connections to OpenWeatherMap are reused
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=100, pool_maxsize=100))
+
 # Global variables for configuration
 apikey = None
 default_city = None
@@ -61,11 +66,8 @@ async def get_weather(city: str = None, days: int = 0) -> dict:
             url = "https://api.openweathermap.org/data/2.5/weather"
             params = {"q": city, "appid": apikey, "units": "metric"}
             
-            # Use asyncio to run the request in a thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None, lambda: requests.get(url, params=params)
-            )
+            # Run the blocking request in a worker thread to avoid blocking the event loop
+            response = await asyncio.to_thread(_session.get, url, params=params)
             
             if response.status_code != 200:
                 logger.error(f"OpenWeatherMap API error: {response.status_code} {response.text}")
@@ -83,11 +85,8 @@ async def get_weather(city: str = None, days: int = 0) -> dict:
             url = "https://api.openweathermap.org/data/2.5/forecast/daily"
             params = {"q": city, "cnt": days+1, "appid": apikey, "units": "metric"}
             
-            # Use asyncio to run the request in a thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None, lambda: requests.get(url, params=params)
-            )
+            # Run the blocking request in a worker thread to avoid blocking the event loop
+            response = await asyncio.to_thread(_session.get, url, params=params)
             
             if response.status_code != 200:
                 # If daily forecast API fails (it might require paid subscription),
@@ -145,11 +144,8 @@ async def get_forecast_fallback_async(city, days):
     url = "https://api.openweathermap.org/data/2.5/forecast"
     params = {"q": city, "appid": apikey, "units": "metric"}
     
-    # Use asyncio to run the request in a thread pool to avoid blocking
-    loop = asyncio.get_event_loop()
-    response = await loop.run_in_executor(
-        None, lambda: requests.get(url, params=params)
-    )
+    # Run the blocking request in a worker thread to avoid blocking the event loop
+    response = await asyncio.to_thread(_session.get, url, params=params)
     
     if response.status_code != 200:
         logger.error(f"Fallback API error: {response.status_code} {response.text}")
@@ -14,6 +14,39 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from weather_mcp.utils.auth import generate_token
 
+async def probe(session, url, label, headers=None):
+    """
+    Send one GET request and describe the response.
+
+    Output is collected rather than printed line by line, so that the lines
+    of concurrent probes are not interleaved.
+
+    Returns:
+        List of output lines for this probe
+    """
+    lines = [f"\nTesting endpoint: {url} ({label})"]
+    try:
+        async with session.get(url, headers=headers) as response:
+            lines.append(f"  Response status: {response.status}")
+            content_type = response.headers.get('Content-Type', '')
+            if 'text/event-stream' in content_type:
+                # An SSE stream never ends, so only report that it opened
+                lines.append(f"  Response is an event stream ({content_type}), not reading the body")
+                response.close()
+            elif response.status == 200:
+                if 'json' in content_type:
+                    data = await response.json()
+                    lines.append(f"  Response {json.dumps(data, indent=2)}")
+                else:
+                    text = await response.text()
+                    lines.append(f"  Response text: {text[:100]}...")
+            else:
+                text = await response.text()
+                lines.append(f"  Response text: {text}")
+    except Exception as e:
+        lines.append(f"  Error: {e}")
+    return lines
+
 async def test_auth():
     parser = argparse.ArgumentParser(description="Test MCP Server Authentication")
     parser.add_argument("--url", default="http://localhost:3399", help="MCP server base URL")
@@ -45,49 +78,20 @@ async def test_auth():
     ]
     
     async with aiohttp.ClientSession() as session:
+        # The probes are independent, so run them all concurrently
+        probes = []
         for endpoint in endpoints:
             url = f"{base_url}{endpoint}"
-            print(f"\nTesting endpoint: {url}")
-            
-            # First try without auth
+            # Try without auth and, if a token is available, with auth
             if not args.no_auth:
-                print("  Testing without auth...")
-                try:
-                    async with session.get(url) as response:
-                        print(f"  Response status: {response.status}")
-                        if response.status == 200:
-                            content_type = response.headers.get('Content-Type', '')
-                            if 'json' in content_type:
-                                data = await response.json()
-                                print(f"  Response {json.dumps(data, indent=2)}")
-                            else:
-                                text = await response.text()
-                                print(f"  Response text: {text[:100]}...")
-                        else:
-                            text = await response.text()
-                            print(f"  Response text: {text}")
-                except Exception as e:
-                    print(f"  Error: {e}")
-            
-            # Then try with auth
+                probes.append(probe(session, url, "without auth"))
             if headers:
-                print("  Testing with auth...")
-                try:
-                    async with session.get(url, headers=headers) as response:
-                        print(f"  Response status: {response.status}")
-                        if response.status == 200:
-                            content_type = response.headers.get('Content-Type', '')
-                            if 'json' in content_type:
-                                data = await response.json()
-                                print(f"  Response {json.dumps(data, indent=2)}")
-                            else:
-                                text = await response.text()
-                                print(f"  Response text: {text[:100]}...")
-                        else:
-                            text = await response.text()
-                            print(f"  Response text: {text}")
-                except Exception as e:
-                    print(f"  Error: {e}")
+                probes.append(probe(session, url, "with auth", headers))
+
+        # Report each probe as soon as it finishes
+        for finished in asyncio.as_completed(probes):
+            for line in await finished:
+                print(line)
 
 if __name__ == "__main__":
     asyncio.run(test_auth())
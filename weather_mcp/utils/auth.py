@@ -6,13 +6,43 @@ including token generation and validation.
 """
 
 import base64
+import functools
 import hashlib
 import hmac
 import json
 import os
 import secrets
+import sys
 import time
-from typing import Dict, Optional, Tuple, Union
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple, Union
+
+# Length of an unpadded URL-safe base64 HMAC-SHA256 signature
+SIGNATURE_B64_LENGTH = 43
+
+# Paths that are always served without authentication (health check).
+# Interned so that an interned request path matches on identity.
+AUTH_BYPASS_PATHS = frozenset(map(sys.intern, ("/mcp/info",)))
+
+# Cache of recently validated tokens, keyed by a SHA-256 prefix of the secret
+# key and token so that plaintext tokens are not kept in memory and a verdict
+# only applies to the key it was checked against. Only valid tokens are
+# cached. The cache is created on first use, so scripts that only generate
+# tokens never import cachetools.
+TOKEN_CACHE_TTL = 30
+TOKEN_CACHE_SIZE = 10000
+_token_cache = None
+
+
+@functools.lru_cache(maxsize=8)
+def _hmac_template(secret_key: bytes) -> "hmac.HMAC":
+    """
+    Return an HMAC-SHA256 object keyed with secret_key and fed no data.
+
+    Callers copy() it instead of calling hmac.new(), which skips re-deriving
+    the inner and outer key pads for every token.
+    """
+    return hmac.new(secret_key, digestmod=hashlib.sha256)
 
 
 def generate_token(
@@ -67,13 +97,13 @@ def generate_token(
     return token
 
 
-def validate_token(token: str, secret_key: str) -> Tuple[bool, Optional[Dict]]:
+def validate_token(token: str, secret_key: Union[str, bytes]) -> Tuple[bool, Optional[Dict]]:
     """
     Validate a Bearer Token.
 
     Args:
         token: The Bearer Token to validate
-        secret_key: The secret key used to sign the token
+        secret_key: The secret key used to sign the token, as str or UTF-8 bytes
 
     Returns:
         A tuple of (is_valid, payload) where:
@@ -83,6 +113,9 @@ def validate_token(token: str, secret_key: str) -> Tuple[bool, Optional[Dict]]:
     if not token or not secret_key:
         return False, None
 
+    if isinstance(secret_key, str):
+        secret_key = secret_key.encode('utf-8')
+
     # Split token into payload and signature
     try:
         parts = token.split('.')
@@ -91,15 +124,17 @@ def validate_token(token: str, secret_key: str) -> Tuple[bool, Optional[Dict]]:
 
         payload_b64, signature_b64 = parts
 
+        # A signature of the wrong length can never match; skip the HMAC.
+        # The length is public, so this does not weaken the constant-time check.
+        if len(signature_b64) != SIGNATURE_B64_LENGTH:
+            return False, None
+
         # Verify signature
-        expected_signature = hmac.new(
-            secret_key.encode('utf-8'),
-            payload_b64.encode('utf-8'),
-            hashlib.sha256
-        ).digest()
-        expected_signature_b64 = base64.urlsafe_b64encode(expected_signature).decode('utf-8').rstrip('=')
-
-        if not hmac.compare_digest(signature_b64, expected_signature_b64):
+        mac = _hmac_template(secret_key).copy()
+        mac.update(payload_b64.encode('ascii'))
+        expected_signature_b64 = base64.urlsafe_b64encode(mac.digest()).rstrip(b'=')
+
+        if not hmac.compare_digest(signature_b64.encode('ascii'), expected_signature_b64):
             return False, None
 
         # Decode payload
@@ -118,6 +153,92 @@ def validate_token(token: str, secret_key: str) -> Tuple[bool, Optional[Dict]]:
         return False, None
 
 
+@functools.lru_cache(maxsize=8)
+def _secret_key_digest(secret_key: bytes) -> bytes:
+    """Return a fixed-length SHA-256 digest of a secret key, for cache keys."""
+    return hashlib.sha256(secret_key).digest()
+
+
+def validate_token_cached(token: bytes, secret_key: Union[str, bytes]) -> Tuple[bool, Optional[Mapping]]:
+    """
+    Validate a Bearer Token, reusing a recent verdict for the same token and
+    secret key.
+
+    A cached verdict never outlives the token's own expiry or TOKEN_CACHE_TTL
+    seconds, whichever comes first.
+
+    Args:
+        token: The Bearer Token to validate, as raw header bytes
+        secret_key: The secret key used to sign the token, as str or UTF-8 bytes
+
+    Returns:
+        A tuple of (is_valid, payload) as returned by validate_token, except
+        that a valid payload is a read-only mapping. The same object is
+        handed to every request carrying the token, so it must not change.
+    """
+    global _token_cache
+    if _token_cache is None:
+        from cachetools import TTLCache
+        _token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL)
+
+    if isinstance(secret_key, str):
+        secret_key = secret_key.encode('utf-8')
+
+    # Key on the secret as well, so a verdict never carries over to another key
+    now = time.time()
+    cache_key = hashlib.sha256(_secret_key_digest(secret_key) + token).digest()[:16]
+    hit = _token_cache.get(cache_key)
+    if hit is not None and hit[1] > now:
+        return True, hit[0]
+
+    is_valid, payload = validate_token(token.decode('latin-1'), secret_key)
+    if is_valid:
+        payload = MappingProxyType(payload)
+        exp = min(payload.get("exp", now + TOKEN_CACHE_TTL), now + TOKEN_CACHE_TTL)
+        _token_cache[cache_key] = (payload, exp)
+    return is_valid, payload
+
+
+def extract_bearer_token(raw_header: Optional[bytes]) -> Optional[bytes]:
+    """
+    Extract Bearer Token from a raw Authorization header value.
+
+    The scheme is checked with one case-insensitive slice of the raw bytes,
+    so ASGI middleware can parse the header without decoding it first.
+
+    Args:
+        raw_header: The Authorization header value as bytes
+
+    Returns:
+        The token bytes if found, None otherwise
+    """
+    # The auth scheme is case-insensitive
+    if not raw_header or raw_header[:7].lower() != b"bearer ":
+        return None
+    token = raw_header[7:]
+    # Tolerate tokens that already include the "Bearer " prefix
+    if token[:7].lower() == b"bearer ":
+        token = token[7:]
+    return token or None
+
+
+def get_bearer_token_from_scope(scope: Dict) -> Optional[bytes]:
+    """
+    Extract Bearer Token from the Authorization header of an ASGI scope.
+
+    Args:
+        scope: The ASGI scope of an HTTP request
+
+    Returns:
+        The token bytes if found, None otherwise
+    """
+    # ASGI servers deliver header names lowercased
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            return extract_bearer_token(value)
+    return None
+
+
 def extract_token_from_header(auth_header: Optional[str]) -> Optional[str]:
     """
     Extract Bearer Token from Authorization header.
@@ -128,9 +249,36 @@ def extract_token_from_header(auth_header: Optional[str]) -> Optional[str]:
     Returns:
         The token if found, None otherwise
     """
-    if not auth_header or not auth_header.startswith("Bearer "):
+    if not auth_header:
         return None
-    return auth_header.replace("Bearer ", "")
+    token = extract_bearer_token(auth_header.encode('utf-8'))
+    return token.decode('utf-8') if token else None
+
+
+def unauthorized_messages(body: bytes) -> Tuple[Dict, Dict]:
+    """
+    Build the ASGI messages for a 401 JSON response.
+
+    Middleware builds these once and sends the same pair for every
+    rejected request.
+
+    Args:
+        body: The JSON response body
+
+    Returns:
+        A tuple of the http.response.start and http.response.body messages
+    """
+    return (
+        {
+            "type": "http.response.start",
+            "status": 401,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+            ],
+        },
+        {"type": "http.response.body", "body": body},
+    )
 
 
 def get_token_from_request(request) -> Optional[str]:
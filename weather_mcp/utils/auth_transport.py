@@ -6,11 +6,23 @@ transport classes and add authentication support.
 """
 
 import logging
-from starlette.responses import JSONResponse
+from starlette.responses import Response
 from utils.auth import validate_token, get_token_from_request
 
 logger = logging.getLogger('weather_mcp.auth_transport')
 
+# 401 responses are constant, so build them once and reuse them for every request
+UNAUTHORIZED_MISSING_TOKEN = Response(
+    content=b'{"error":"Unauthorized: Missing Bearer Token"}',
+    status_code=401,
+    media_type="application/json"
+)
+UNAUTHORIZED_INVALID_TOKEN = Response(
+    content=b'{"error":"Unauthorized: Invalid Bearer Token"}',
+    status_code=401,
+    media_type="application/json"
+)
+
 class AuthenticatedStreamableHttpTransport:
     """
     A wrapper around the streamable-http transport that adds authentication support.
@@ -29,6 +41,9 @@ class AuthenticatedStreamableHttpTransport:
         """
         self.original_transport = original_transport
         self.secret_key = secret_key
+        # Bind the logger methods once; handle_request runs for every request
+        self._debug = logger.debug
+        self._warn = logger.warning
         logger.info("Initialized AuthenticatedStreamableHttpTransport")
         
     async def handle_request(self, request):
@@ -42,28 +57,24 @@ class AuthenticatedStreamableHttpTransport:
             The response from the original transport if authenticated,
             or a 401 Unauthorized response if not authenticated
         """
-        logger.info(f"AuthenticatedStreamableHttpTransport handling request: {request.method} {request.url.path}")
+        path = request.url.path
+        self._debug("AuthenticatedStreamableHttpTransport handling request: %s %s", request.method, path)
         
         # Extract and validate token
         token = get_token_from_request(request)
         if not token:
-            logger.warning(f"Authentication failed: Missing Bearer Token for {request.url.path}")
-            return JSONResponse(
-                status_code=401,
-                content={"error": "Unauthorized: Missing Bearer Token"}
-            )
+            self._warn("Authentication failed: Missing Bearer Token for %s", path)
+            return UNAUTHORIZED_MISSING_TOKEN
             
-        logger.info(f"Validating token: {token[:20]}...")
+        if logger.isEnabledFor(logging.DEBUG):
+            self._debug("Validating token: %s...", token[:20])
         is_valid, payload = validate_token(token, self.secret_key)
         if not is_valid:
-            logger.warning(f"Authentication failed: Invalid Bearer Token for {request.url.path}")
-            return JSONResponse(
-                status_code=401,
-                content={"error": "Unauthorized: Invalid Bearer Token"}
-            )
+            self._warn("Authentication failed: Invalid Bearer Token for %s", path)
+            return UNAUTHORIZED_INVALID_TOKEN
             
         # Token is valid, proceed with the request
-        logger.info(f"Authentication successful for {request.url.path}")
+        self._debug("Authentication successful for %s", path)
         return await self.original_transport.handle_request(request)
 
 
@@ -85,6 +96,9 @@ class AuthenticatedSseTransport:
         """
         self.original_transport = original_transport
         self.secret_key = secret_key
+        # Bind the logger methods once; handle_request runs for every request
+        self._debug = logger.debug
+        self._warn = logger.warning
         logger.info("Initialized AuthenticatedSseTransport")
         
     async def handle_request(self, request):
@@ -98,26 +112,22 @@ class AuthenticatedSseTransport:
             The response from the original transport if authenticated,
             or a 401 Unauthorized response if not authenticated
         """
-        logger.info(f"AuthenticatedSseTransport handling request: {request.method} {request.url.path}")
+        path = request.url.path
+        self._debug("AuthenticatedSseTransport handling request: %s %s", request.method, path)
         
         # Extract and validate token
         token = get_token_from_request(request)
         if not token:
-            logger.warning(f"Authentication failed: Missing Bearer Token for {request.url.path}")
-            return JSONResponse(
-                status_code=401,
-                content={"error": "Unauthorized: Missing Bearer Token"}
-            )
+            self._warn("Authentication failed: Missing Bearer Token for %s", path)
+            return UNAUTHORIZED_MISSING_TOKEN
             
-        logger.info(f"Validating token: {token[:20]}...")
+        if logger.isEnabledFor(logging.DEBUG):
+            self._debug("Validating token: %s...", token[:20])
         is_valid, payload = validate_token(token, self.secret_key)
         if not is_valid:
-            logger.warning(f"Authentication failed: Invalid Bearer Token for {request.url.path}")
-            return JSONResponse(
-                status_code=401,
-                content={"error": "Unauthorized: Invalid Bearer Token"}
-            )
+            self._warn("Authentication failed: Invalid Bearer Token for %s", path)
+            return UNAUTHORIZED_INVALID_TOKEN
             
         # Token is valid, proceed with the request
-        logger.info(f"Authentication successful for {request.url.path}")
+        self._debug("Authentication successful for %s", path)
         return await self.original_transport.handle_request(request)
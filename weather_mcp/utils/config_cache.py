@@ -0,0 +1,133 @@
+"""
+Configuration loading utilities for the Weather MCP Server.
+
+This module parses config.yaml once per version of the file, identified by
+its modification time and size, and keeps a JSON sidecar next to it, so that
+later processes can skip YAML parsing entirely.
+"""
+
+import functools
+import json
+import os
+from typing import Dict, Optional
+
+SIDECAR_SUFFIX = '.json'
+
+
+def _sidecar_path(path: str) -> str:
+    """Return the path of the JSON sidecar for a config file (config.yaml.json)."""
+    return path + SIDECAR_SUFFIX
+
+
+def _read_sidecar(path: str, mtime_ns: int, size: int) -> Optional[Dict]:
+    """
+    Read the cached config from the JSON sidecar.
+
+    Args:
+        path: Path to the config.yaml file
+        mtime_ns: Modification time of the config.yaml file in nanoseconds
+        size: Size of the config.yaml file in bytes
+
+    Returns:
+        The cached configuration if the sidecar matches mtime_ns and size, None otherwise
+    """
+    try:
+        with open(_sidecar_path(path), 'rb') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if (not isinstance(cached, dict)
+            or cached.get('mtime_ns') != mtime_ns
+            or cached.get('size') != size):
+        return None
+    return cached.get('config')
+
+
+def _write_sidecar(path: str, mtime_ns: int, size: int, config: Dict) -> None:
+    """
+    Write the parsed config to the JSON sidecar, ignoring any failure.
+
+    Configs holding an auth secret key are never copied to a sidecar, and any
+    existing sidecar for them is removed. Other sidecars still hold the API
+    key, so they are created readable by their owner only. The data goes to a
+    per-process temporary file that is then renamed over the sidecar, so
+    concurrent readers never see a partially written file.
+    """
+    sidecar = _sidecar_path(path)
+    auth = config.get('auth') if isinstance(config, dict) else None
+    if isinstance(auth, dict) and auth.get('secret_key'):
+        try:
+            os.remove(sidecar)
+        except OSError:
+            pass
+        return
+
+    try:
+        # Skip configs that JSON would change, e.g. non-string keys
+        if json.loads(json.dumps(config)) != config:
+            return
+        data = json.dumps({
+            'mtime_ns': mtime_ns,
+            'size': size,
+            'config': config,
+        })
+    except (TypeError, ValueError):
+        # Values that JSON cannot represent
+        return
+
+    tmp_path = f'{sidecar}.{os.getpid()}.tmp'
+    try:
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except OSError:
+        # Read-only directory or a leftover temporary file
+        return
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(data)
+        os.replace(tmp_path, sidecar)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+@functools.lru_cache(maxsize=1)
+def _load_config(path: str, mtime_ns: int, size: int) -> Dict:
+    """Load the config for a given path, mtime and size, parsing YAML only on a cache miss."""
+    config = _read_sidecar(path, mtime_ns, size)
+    if config is not None:
+        return config
+
+    # PyYAML is only imported when the sidecar cannot be used
+    import yaml
+
+    # Prefer the libyaml-backed loader when PyYAML was built with it
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    with open(path, 'rb') as f:
+        config = yaml.load(f, Loader=loader) or {}
+
+    _write_sidecar(path, mtime_ns, size, config)
+    return config
+
+
+def load_config(path: str) -> Dict:
+    """
+    Load a YAML configuration file.
+
+    The result is cached in memory and in a JSON sidecar, both keyed by the
+    file's modification time and size. Including the size catches edits that
+    land within the filesystem's timestamp granularity.
+
+    Args:
+        path: Path to the config.yaml file
+
+    Returns:
+        The parsed configuration dictionary
+
+    Raises:
+        FileNotFoundError: If the config file does not exist
+    """
+    st = os.stat(path)
+    return _load_config(path, st.st_mtime_ns, st.st_size)
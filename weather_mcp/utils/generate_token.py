@@ -10,13 +10,12 @@ or a config file.
 import argparse
 import os
 import sys
-import yaml
 from pathlib import Path
-from dotenv import load_dotenv
 
 # Add parent directory to path to import auth module
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 from weather_mcp.utils.auth import generate_token
+from weather_mcp.utils.config_cache import load_config
 
 
 def main():
@@ -49,8 +48,10 @@ def main():
     
     # If not provided as arguments, try environment variables
     if not secret_key or not expiry:
-        # Try to load from .env file
-        load_dotenv(Path(__file__).resolve().parent.parent / '.env')
+        # Try to load from .env file, unless the environment already has both values
+        if not (os.getenv("AUTH_SECRET_KEY") and os.getenv("AUTH_TOKEN_EXPIRY")):
+            from dotenv import load_dotenv
+            load_dotenv(Path(__file__).resolve().parent.parent / '.env', override=False)
         
         if not secret_key:
             secret_key = os.getenv("AUTH_SECRET_KEY")
@@ -68,8 +69,7 @@ def main():
         config_path = Path(__file__).resolve().parent.parent / 'config.yaml'
         if config_path.exists():
             try:
-                with open(config_path, 'r') as f:
-                    config = yaml.safe_load(f)
+                config = load_config(str(config_path))
                 
                 if not secret_key and config.get('auth', {}).get('secret_key'):
                     secret_key = config['auth']['secret_key']